@@ -1,8 +1,9 @@
+import html
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime, time, timedelta
-import pytz
-from dateutil import parser
+from zoneinfo import ZoneInfo
 import plotly.express as px
 import plotly.graph_objects as go
 from call_logs_reader import fetch_call_logs
@@ -53,7 +54,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Timezone for IST
-IST_TIMEZONE = pytz.timezone('Asia/Kolkata')
+IST_TIMEZONE = ZoneInfo('Asia/Kolkata')
 
 # Language mapping dictionary
 LANGUAGE_MAPPING = {
@@ -81,303 +82,239 @@ CHART_COLORS = {
     'time': ['#16a085', '#1abc9c', '#48c9b0', '#76d7c4', '#a3e4d7']  # Professional teal shades
 }
 
-# Title and current time
-st.title("📊 Call Analytics Dashboard")
-current_time = datetime.now(IST_TIMEZONE).strftime("%A, %B %d, %Y %I:%M %p")
-st.write(f"Current date and time: {current_time} IST")
+# Shared Plotly layouts for charts
+BASE_LAYOUT = dict(
+    title_font=dict(size=20, color='#2C3E50'),
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)'
+)
+PIE_LAYOUT = dict(BASE_LAYOUT, legend_font=dict(size=12))
+AXIS_LAYOUT = dict(
+    BASE_LAYOUT,
+    xaxis_title_font=dict(size=12),
+    yaxis_title_font=dict(size=12),
+    xaxis=dict(gridcolor='#E5E8E8'),
+    yaxis=dict(gridcolor='#E5E8E8')
+)
 
-# Initialize session state variables
-if 'logs' not in st.session_state:
-    st.session_state.logs = []
-if 'prev_start_date' not in st.session_state:
-    st.session_state.prev_start_date = None
-if 'prev_end_date' not in st.session_state:
-    st.session_state.prev_end_date = None
-if 'fetched' not in st.session_state:
-    st.session_state.fetched = False
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_fetch_call_logs(start_iso, end_iso):
+    """Fetch call logs for an ISO datetime range, reusing results for five minutes."""
+    return fetch_call_logs(datetime.fromisoformat(start_iso), datetime.fromisoformat(end_iso))
 
-# Date range selector in sidebar
-with st.sidebar:
-    st.header("📅 Date Range")
-    start_date = st.date_input("From Date", value=(datetime.now(IST_TIMEZONE) - timedelta(days=7)).date())
-    end_date = st.date_input("To Date", value=datetime.now(IST_TIMEZONE).date())
-    
-    if st.button("Fetch Logs", type="primary", use_container_width=True):
-        with st.spinner("Fetching logs..."):
-            try:
-                start_datetime = datetime.combine(start_date, time.min).replace(tzinfo=IST_TIMEZONE)
-                end_datetime = datetime.combine(end_date, time.max).replace(tzinfo=IST_TIMEZONE)
-                logs = fetch_call_logs(start_datetime, end_datetime)
-                st.session_state.logs = logs
-                st.session_state.fetched = True
-                st.session_state.prev_start_date = start_date
-                st.session_state.prev_end_date = end_date
-            except Exception as e:
-                st.error(f"Error fetching logs: {e}")
+def build_dataframe(logs):
+    """Process raw call logs into a DataFrame, one column at a time."""
+    meta = pd.DataFrame([log['metadata'] for log in logs])
+    start_dt = pd.Series(pd.to_datetime(
+        [log['call_timestamps']['start'] for log in logs], utc=True
+    )).dt.tz_convert(IST_TIMEZONE)
+    end_dt = pd.Series(pd.to_datetime(
+        [log['call_timestamps']['end'] for log in logs], utc=True
+    )).dt.tz_convert(IST_TIMEZONE)
+    total_seconds = pd.Series([log['call_duration']['total_seconds'] for log in logs])
+    duration_minutes = total_seconds / 60
 
-# Clear logs if date range changes
-if start_date != st.session_state.prev_start_date or end_date != st.session_state.prev_end_date:
-    st.session_state.logs = []
-    st.session_state.fetched = False
+    # Calculate costs (missing per-minute rates count as zero)
+    rates = meta.reindex(
+        columns=['LLM_cost_per_min', 'STT_cost_per_min', 'TTS_cost_per_min', 'total_cost_per_min']
+    ).fillna(0)
 
-# Display content based on session state
-if st.session_state.logs:
-    # Process logs into a DataFrame
-    log_data = []
-    for log in st.session_state.logs:
-        metadata = log['metadata']
-        stt_language = LANGUAGE_MAPPING.get(metadata['STT_language'], metadata['STT_language'])
-        tts_language = LANGUAGE_MAPPING.get(metadata['TTS_language'], metadata['TTS_language'])
-        start_time = parser.isoparse(log['call_timestamps']['start'])
-        end_time = parser.isoparse(log['call_timestamps']['end'])
-        duration_minutes = log['call_duration']['total_seconds'] / 60
-        
-        # Calculate costs
-        llm_cost = duration_minutes * metadata.get('LLM_cost_per_min', 0)
-        stt_cost = duration_minutes * metadata.get('STT_cost_per_min', 0)
-        tts_cost = duration_minutes * metadata.get('TTS_cost_per_min', 0)
-        total_cost = duration_minutes * metadata.get('total_cost_per_min', 0)
-        
-        log_dict = {
-            "Date": start_time.date(),
-            "Start Time": start_time.strftime("%Y-%m-%d %H:%M:%S"),
-            "End Time": end_time.strftime("%Y-%m-%d %H:%M:%S"),
-            "Duration (min)": round(duration_minutes, 2),
-            "Phone Number": metadata['phone_number'],
-            "LLM Model": metadata['LLM_model'],
-            "LLM Provider": metadata['LLM_provider'],
-            "LLM Temperature": metadata['LLM_temperature'],
-            "STT Language": stt_language,
-            "STT Model": metadata['STT_model'],
-            "STT Provider": metadata['STT_provider'],
-            "TTS Language": tts_language,
-            "TTS Provider": metadata['TTS_provider'],
-            "TTS Voice": metadata['TTS_voice'],
-            "LLM Cost (USD)": round(llm_cost, 4),
-            "STT Cost (USD)": round(stt_cost, 4),
-            "TTS Cost (USD)": round(tts_cost, 4),
-            "Total Cost (USD)": round(total_cost, 4),
-            "Auto End Call": metadata['auto_end_call'],
-            "Background Sound": metadata['background_sound'],
-            "Is Allow Interruptions": metadata['is_allow_interruptions'],
-            "Use Retrieval": metadata['use_retrieval'],
-            "VAD Min Silence": metadata['vad_min_silence'],
-            "Conversation": log['conversation_transcript'],
-            "Audio URL": log['audio_file']['sas_url'],
-            "System Prompt": metadata['LLM_system_prompt'],
-            "First Message": metadata['first_message']
-        }
-        log_data.append(log_dict)
-    
-    df = pd.DataFrame(log_data)
+    df = pd.DataFrame({
+        "Date": start_dt.dt.date,
+        "Start Time": start_dt.dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "End Time": end_dt.dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "Duration (min)": duration_minutes.round(2),
+        "Total Seconds": total_seconds,
+        "Phone Number": meta['phone_number'],
+        "LLM Model": meta['LLM_model'],
+        "LLM Provider": meta['LLM_provider'],
+        "LLM Temperature": meta['LLM_temperature'],
+        "STT Language": meta['STT_language'].map(LANGUAGE_MAPPING).fillna(meta['STT_language']),
+        "STT Model": meta['STT_model'],
+        "STT Provider": meta['STT_provider'],
+        "TTS Language": meta['TTS_language'].map(LANGUAGE_MAPPING).fillna(meta['TTS_language']),
+        "TTS Provider": meta['TTS_provider'],
+        "TTS Voice": meta['TTS_voice'],
+        "LLM Cost (USD)": (duration_minutes * rates['LLM_cost_per_min']).round(4),
+        "STT Cost (USD)": (duration_minutes * rates['STT_cost_per_min']).round(4),
+        "TTS Cost (USD)": (duration_minutes * rates['TTS_cost_per_min']).round(4),
+        "Total Cost (USD)": (duration_minutes * rates['total_cost_per_min']).round(4),
+        "Auto End Call": meta['auto_end_call'],
+        "Background Sound": meta['background_sound'],
+        "Is Allow Interruptions": meta['is_allow_interruptions'],
+        "Use Retrieval": meta['use_retrieval'],
+        "VAD Min Silence": meta['vad_min_silence'],
+        # Position in the raw logs list; heavy fields are looked up from there
+        "log_id": np.arange(len(logs)),
+        # Parsed start timestamp, used as the index for time-based grouping and filtering
+        "_start_dt": start_dt
+    })
+    # Provider, model and language labels repeat across calls, so store them as categoricals
+    df = df.astype(dict.fromkeys([
+        "LLM Model", "LLM Provider", "STT Language", "STT Provider",
+        "TTS Language", "TTS Provider", "TTS Voice"
+    ], 'category'))
+    return df.set_index('_start_dt').sort_index(ascending=False)
 
-    # Call Statistics Section
-    st.header("📈 Call Statistics")
-    col1, col2, col3, col4 = st.columns(4)
-    
-    total_calls = len(df)
-    total_duration = df['Duration (min)'].sum()
-    total_cost = df['Total Cost (USD)'].sum()
-    avg_duration = total_duration / total_calls if total_calls > 0 else 0
-    
-    with col1:
-        st.metric("Total Calls", f"{total_calls:,}")
-    with col2:
-        st.metric("Total Duration", f"{total_duration:.1f} min")
-    with col3:
-        st.metric("Average Duration", f"{avg_duration:.1f} min")
-    with col4:
-        st.metric("Total Cost", f"${total_cost:.2f}")
+def build_aggregates(df):
+    """Precompute the chart aggregates so reruns only redraw them."""
+    stt_counts = df['STT Language'].value_counts().rename_axis('STT Language').reset_index(name='Count')
+    tts_counts = df['TTS Voice'].value_counts().rename_axis('TTS Voice').reset_index(name='Count')
+    llm_counts = df['LLM Model'].value_counts().rename_axis('LLM Model').reset_index(name='Count')
+    llm_provider_counts = df['LLM Provider'].value_counts().rename_axis('LLM Provider').reset_index(name='Count')
+    daily = (
+        df['Total Cost (USD)'].resample('D')
+        .agg(['sum', 'size'])
+        .set_axis(['Total Cost (USD)', 'Number of Calls'], axis=1)
+    )
+    # Label each IST day by its local calendar date
+    daily.index = daily.index.tz_localize(None).rename('Date')
+    counts, edges = np.histogram(df['Duration (min)'], bins=20)
+    duration_bins = pd.DataFrame({
+        'Duration (min)': (edges[:-1] + edges[1:]) / 2,
+        'Count': counts,
+        'Width': np.diff(edges)
+    })
+    return {
+        'cost_breakdown': {
+            'LLM Cost': df['LLM Cost (USD)'].sum(),
+            'STT Cost': df['STT Cost (USD)'].sum(),
+            'TTS Cost': df['TTS Cost (USD)'].sum()
+        },
+        'daily': daily.reset_index(),
+        'duration_bins': duration_bins,
+        'stt_counts': stt_counts,
+        'tts_counts': tts_counts,
+        'llm_counts': llm_counts,
+        'llm_provider_counts': llm_provider_counts
+    }
 
-    # Call Analysis Section
-    st.header("📊 Call Analysis")
-    
-    # Create tabs for different analyses
-    tab1, tab2, tab3, tab4 = st.tabs(["Cost Analysis", "Language Distribution", "Time Analysis", "Model Usage"])
-    
-    with tab1:
-        col1, col2 = st.columns(2)
-        with col1:
-            # Cost breakdown pie chart
-            cost_breakdown = {
-                'LLM Cost': df['LLM Cost (USD)'].sum(),
-                'STT Cost': df['STT Cost (USD)'].sum(),
-                'TTS Cost': df['TTS Cost (USD)'].sum()
-            }
-            fig_cost = px.pie(
-                values=list(cost_breakdown.values()),
-                names=list(cost_breakdown.keys()),
-                title="Cost Distribution (USD)",
-                color_discrete_sequence=COLOR_SCHEMES['qualitative']
-            )
-            fig_cost.update_traces(
-                textposition='inside',
-                textinfo='percent+label',
-                marker=dict(line=dict(color='#FFFFFF', width=1))
-            )
-            fig_cost.update_layout(
-                title_font=dict(size=20, color='#2C3E50'),
-                legend_font=dict(size=12),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)'
-            )
-            st.plotly_chart(fig_cost, use_container_width=True)
-        
-        with col2:
-            # Cost per call over time
-            fig_cost_time = px.line(
-                df.groupby('Date')['Total Cost (USD)'].sum().reset_index(),
-                x='Date',
-                y='Total Cost (USD)',
-                title="Daily Cost Trend (USD)",
-                color_discrete_sequence=COLOR_SCHEMES['qualitative']
-            )
-            fig_cost_time.update_layout(
-                title_font=dict(size=20, color='#2C3E50'),
-                xaxis_title_font=dict(size=12),
-                yaxis_title_font=dict(size=12),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(gridcolor='#E5E8E8'),
-                yaxis=dict(gridcolor='#E5E8E8')
-            )
-            st.plotly_chart(fig_cost_time, use_container_width=True)
-    
-    with tab2:
-        col1, col2 = st.columns(2)
-        with col1:
-            # STT Language distribution
-            fig_stt = px.pie(
-                df,
-                names='STT Language',
-                title="STT Language Distribution",
-                color_discrete_sequence=COLOR_SCHEMES['qualitative']
-            )
-            fig_stt.update_traces(
-                textposition='inside',
-                textinfo='percent+label',
-                marker=dict(line=dict(color='#FFFFFF', width=1))
-            )
-            fig_stt.update_layout(
-                title_font=dict(size=20, color='#2C3E50'),
-                legend_font=dict(size=12),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)'
-            )
-            st.plotly_chart(fig_stt, use_container_width=True)
-        
-        with col2:
-            # TTS Voice distribution
-            tts_counts = df['TTS Voice'].value_counts().reset_index()
-            tts_counts.columns = ['TTS Voice', 'Count']
-            fig_tts = px.bar(
-                tts_counts,
-                x='TTS Voice',
-                y='Count',
-                title="TTS Voice Distribution",
-                color_discrete_sequence=COLOR_SCHEMES['qualitative']
-            )
-            fig_tts.update_layout(
-                title_font=dict(size=20, color='#2C3E50'),
-                xaxis_title_font=dict(size=12),
-                yaxis_title_font=dict(size=12),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(gridcolor='#E5E8E8'),
-                yaxis=dict(gridcolor='#E5E8E8')
-            )
-            st.plotly_chart(fig_tts, use_container_width=True)
-    
-    with tab3:
-        col1, col2 = st.columns(2)
-        with col1:
-            # Call duration distribution
-            fig_duration = px.histogram(
-                df,
-                x='Duration (min)',
-                title="Call Duration Distribution",
-                color_discrete_sequence=COLOR_SCHEMES['qualitative'],
-                nbins=20
-            )
-            fig_duration.update_layout(
-                title_font=dict(size=20, color='#2C3E50'),
-                xaxis_title_font=dict(size=12),
-                yaxis_title_font=dict(size=12),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(gridcolor='#E5E8E8'),
-                yaxis=dict(gridcolor='#E5E8E8')
-            )
-            st.plotly_chart(fig_duration, use_container_width=True)
-        
-        with col2:
-            # Calls over time
-            calls_over_time = df.groupby('Date').size().reset_index()
-            calls_over_time.columns = ['Date', 'Number of Calls']
-            fig_time = px.line(
-                calls_over_time,
-                x='Date',
-                y='Number of Calls',
-                title="Calls Over Time",
-                color_discrete_sequence=COLOR_SCHEMES['qualitative']
-            )
-            fig_time.update_layout(
-                title_font=dict(size=20, color='#2C3E50'),
-                xaxis_title_font=dict(size=12),
-                yaxis_title_font=dict(size=12),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(gridcolor='#E5E8E8'),
-                yaxis=dict(gridcolor='#E5E8E8')
-            )
-            st.plotly_chart(fig_time, use_container_width=True)
-    
-    with tab4:
-        col1, col2 = st.columns(2)
-        with col1:
-            # LLM Model distribution
-            llm_counts = df['LLM Model'].value_counts().reset_index()
-            llm_counts.columns = ['LLM Model', 'Count']
-            fig_llm = px.bar(
-                llm_counts,
-                x='LLM Model',
-                y='Count',
-                title="LLM Model Distribution",
-                color_discrete_sequence=COLOR_SCHEMES['qualitative']
-            )
-            fig_llm.update_layout(
-                title_font=dict(size=20, color='#2C3E50'),
-                xaxis_title_font=dict(size=12),
-                yaxis_title_font=dict(size=12),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(gridcolor='#E5E8E8'),
-                yaxis=dict(gridcolor='#E5E8E8')
-            )
-            st.plotly_chart(fig_llm, use_container_width=True)
-        
-        with col2:
-            # Provider distribution
-            fig_provider = px.pie(
-                df,
-                names='LLM Provider',
-                title="LLM Provider Distribution",
-                color_discrete_sequence=COLOR_SCHEMES['qualitative']
-            )
-            fig_provider.update_traces(
-                textposition='inside',
-                textinfo='percent+label',
-                marker=dict(line=dict(color='#FFFFFF', width=1))
-            )
-            fig_provider.update_layout(
-                title_font=dict(size=20, color='#2C3E50'),
-                legend_font=dict(size=12),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)'
-            )
-            st.plotly_chart(fig_provider, use_container_width=True)
+def build_filter_options(df):
+    """Precompute the choices for the call log filters (categories are already sorted)."""
+    return {
+        'min_date': df['Date'].min(),
+        'max_date': df['Date'].max(),
+        'stt_language': df['STT Language'].cat.categories.tolist(),
+        'llm_model': df['LLM Model'].cat.categories.tolist(),
+        'tts_provider': df['TTS Provider'].cat.categories.tolist(),
+        'stt_provider': df['STT Provider'].cat.categories.tolist(),
+        'llm_provider': df['LLM Provider'].cat.categories.tolist()
+    }
 
-    # Call Logs Section with Filters
+def build_figures(aggregates):
+    """Build the analysis charts once per fetch so reruns only redraw them."""
+    # Cost breakdown pie chart
+    cost_breakdown = aggregates['cost_breakdown']
+    fig_cost = px.pie(
+        values=list(cost_breakdown.values()),
+        names=list(cost_breakdown.keys()),
+        title="Cost Distribution (USD)",
+        color_discrete_sequence=COLOR_SCHEMES['qualitative']
+    )
+    fig_cost.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        marker=dict(line=dict(color='#FFFFFF', width=1))
+    )
+    fig_cost.update_layout(**PIE_LAYOUT)
+
+    # Cost per call over time
+    fig_cost_time = px.line(
+        aggregates['daily'],
+        x='Date',
+        y='Total Cost (USD)',
+        title="Daily Cost Trend (USD)",
+        color_discrete_sequence=COLOR_SCHEMES['qualitative'],
+        render_mode='webgl'
+    )
+    fig_cost_time.update_layout(**AXIS_LAYOUT)
+
+    # STT Language distribution
+    fig_stt = px.pie(
+        aggregates['stt_counts'],
+        names='STT Language',
+        values='Count',
+        title="STT Language Distribution",
+        color_discrete_sequence=COLOR_SCHEMES['qualitative']
+    )
+    fig_stt.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        marker=dict(line=dict(color='#FFFFFF', width=1))
+    )
+    fig_stt.update_layout(**PIE_LAYOUT)
+
+    # TTS Voice distribution
+    fig_tts = px.bar(
+        aggregates['tts_counts'],
+        x='TTS Voice',
+        y='Count',
+        title="TTS Voice Distribution",
+        color_discrete_sequence=COLOR_SCHEMES['qualitative']
+    )
+    fig_tts.update_layout(**AXIS_LAYOUT)
+
+    # Call duration distribution (pre-binned, one bar per bin)
+    duration_bins = aggregates['duration_bins']
+    fig_duration = px.bar(
+        duration_bins,
+        x='Duration (min)',
+        y='Count',
+        title="Call Duration Distribution",
+        color_discrete_sequence=COLOR_SCHEMES['qualitative']
+    )
+    fig_duration.update_traces(width=duration_bins['Width'])
+    fig_duration.update_layout(**AXIS_LAYOUT)
+
+    # Calls over time
+    fig_time = px.line(
+        aggregates['daily'],
+        x='Date',
+        y='Number of Calls',
+        title="Calls Over Time",
+        color_discrete_sequence=COLOR_SCHEMES['qualitative'],
+        render_mode='webgl'
+    )
+    fig_time.update_layout(**AXIS_LAYOUT)
+
+    # LLM Model distribution
+    fig_llm = px.bar(
+        aggregates['llm_counts'],
+        x='LLM Model',
+        y='Count',
+        title="LLM Model Distribution",
+        color_discrete_sequence=COLOR_SCHEMES['qualitative']
+    )
+    fig_llm.update_layout(**AXIS_LAYOUT)
+
+    # Provider distribution
+    fig_provider = px.pie(
+        aggregates['llm_provider_counts'],
+        names='LLM Provider',
+        values='Count',
+        title="LLM Provider Distribution",
+        color_discrete_sequence=COLOR_SCHEMES['qualitative']
+    )
+    fig_provider.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        marker=dict(line=dict(color='#FFFFFF', width=1))
+    )
+    fig_provider.update_layout(**PIE_LAYOUT)
+    return {
+        'cost': fig_cost,
+        'cost_time': fig_cost_time,
+        'stt': fig_stt,
+        'tts': fig_tts,
+        'duration': fig_duration,
+        'time': fig_time,
+        'llm': fig_llm,
+        'provider': fig_provider
+    }
+
+@st.fragment
+def render_logs_section(df, filter_options):
+    """Render the filters, log table and detail view; widget changes rerun only this block."""
     st.header("📋 Call Logs")
     
     # Advanced Filters with specified options
@@ -390,18 +327,18 @@ if st.session_state.logs:
             date_filter = st.date_input(
                 "Date",
                 value=None,
-                min_value=df['Date'].min(),
-                max_value=df['Date'].max()
+                min_value=filter_options['min_date'],
+                max_value=filter_options['max_date']
             )
         with row1_col3:
             stt_language_filter = st.selectbox(
                 "STT Language",
-                ["All"] + sorted(df['STT Language'].unique().tolist())
+                ["All"] + filter_options['stt_language']
             )
         with row1_col4:
             llm_model_filter = st.selectbox(
                 "LLM Model",
-                ["All"] + sorted(df['LLM Model'].unique().tolist())
+                ["All"] + filter_options['llm_model']
             )
 
         # Second row of filters
@@ -409,17 +346,17 @@ if st.session_state.logs:
         with row2_col1:
             tts_provider_filter = st.selectbox(
                 "TTS Provider",
-                ["All"] + sorted(df['TTS Provider'].unique().tolist())
+                ["All"] + filter_options['tts_provider']
             )
         with row2_col2:
             stt_provider_filter = st.selectbox(
                 "STT Provider",
-                ["All"] + sorted(df['STT Provider'].unique().tolist())
+                ["All"] + filter_options['stt_provider']
             )
         with row2_col3:
             llm_provider_filter = st.selectbox(
                 "LLM Provider",
-                ["All"] + sorted(df['LLM Provider'].unique().tolist())
+                ["All"] + filter_options['llm_provider']
             )
         with row2_col4:
             use_retrieval_filter = st.selectbox(
@@ -427,37 +364,46 @@ if st.session_state.logs:
                 ["All", "Yes", "No"]
             )
 
-    # Apply filters
-    filtered_df = df.copy()
+    # Apply date filter as a positional slice of the DatetimeIndex, which is
+    # sorted most recent first: binary-search the day bounds on its ascending view
+    if date_filter:
+        day_start = pd.Timestamp(date_filter, tz=IST_TIMEZONE)
+        day_end = day_start + pd.Timedelta(days=1)
+        ascending_index = df.index[::-1]
+        df = df.iloc[
+            len(df) - ascending_index.searchsorted(day_end):
+            len(df) - ascending_index.searchsorted(day_start)
+        ]
+
+    # Apply remaining filters as a single boolean mask
+    mask = np.ones(len(df), dtype=bool)
     
     # Apply phone number filter
     if phone_filter and phone_filter.strip():
-        filtered_df = filtered_df[filtered_df['Phone Number'].str.contains(phone_filter.strip(), case=False, regex=False)]
-    
-    # Apply date filter
-    if date_filter:
-        filtered_df = filtered_df[filtered_df['Date'] == date_filter]
+        mask &= df['Phone Number'].str.contains(phone_filter.strip(), case=False, regex=False, na=False).to_numpy()
     
     # Apply language filter
     if stt_language_filter != "All":
-        filtered_df = filtered_df[filtered_df['STT Language'] == stt_language_filter]
+        mask &= df['STT Language'].eq(stt_language_filter).to_numpy()
     
     # Apply provider filters
     if tts_provider_filter != "All":
-        filtered_df = filtered_df[filtered_df['TTS Provider'] == tts_provider_filter]
+        mask &= df['TTS Provider'].eq(tts_provider_filter).to_numpy()
     if stt_provider_filter != "All":
-        filtered_df = filtered_df[filtered_df['STT Provider'] == stt_provider_filter]
+        mask &= df['STT Provider'].eq(stt_provider_filter).to_numpy()
     if llm_provider_filter != "All":
-        filtered_df = filtered_df[filtered_df['LLM Provider'] == llm_provider_filter]
+        mask &= df['LLM Provider'].eq(llm_provider_filter).to_numpy()
     
     # Apply LLM model filter
     if llm_model_filter != "All":
-        filtered_df = filtered_df[filtered_df['LLM Model'] == llm_model_filter]
+        mask &= df['LLM Model'].eq(llm_model_filter).to_numpy()
     
     # Apply use retrieval filter
     if use_retrieval_filter != "All":
         use_retrieval_value = use_retrieval_filter == "Yes"
-        filtered_df = filtered_df[filtered_df['Use Retrieval'] == use_retrieval_value]
+        mask &= df['Use Retrieval'].eq(use_retrieval_value).to_numpy()
+
+    filtered_df = df.loc[mask]
 
     # Display the filtered dataframe with all metadata columns
     display_columns = [
@@ -470,60 +416,183 @@ if st.session_state.logs:
         "Use Retrieval", "VAD Min Silence"
     ]
     
-    # Format the dataframe with markdown
-    styled_df = filtered_df[display_columns].sort_values('Date', ascending=False)
-    styled_df = styled_df.style.format({
-        'Duration (min)': '{:.2f}',
-        'LLM Temperature': '{:.2f}',
-        'LLM Cost (USD)': '${:.4f}',
-        'STT Cost (USD)': '${:.4f}',
-        'TTS Cost (USD)': '${:.4f}',
-        'Total Cost (USD)': '${:.4f}',
-        'VAD Min Silence': '{:.2f}'
-    })
-    
+    # Number formats are applied client-side by st.dataframe
     st.dataframe(
-        styled_df,
+        filtered_df[display_columns],
         use_container_width=True,
-        hide_index=True
+        hide_index=True,
+        column_config={
+            'Duration (min)': st.column_config.NumberColumn(format='%.2f'),
+            'LLM Temperature': st.column_config.NumberColumn(format='%.2f'),
+            'LLM Cost (USD)': st.column_config.NumberColumn(format='$%.4f'),
+            'STT Cost (USD)': st.column_config.NumberColumn(format='$%.4f'),
+            'TTS Cost (USD)': st.column_config.NumberColumn(format='$%.4f'),
+            'Total Cost (USD)': st.column_config.NumberColumn(format='$%.4f'),
+            'VAD Min Silence': st.column_config.NumberColumn(format='%.2f')
+        }
     )
 
     # Detailed view for selected log
     st.subheader("Detailed Log View")
-    options = [f"{log['Start Time']} - {log['Phone Number']}" for log in filtered_df.to_dict('records')]
+    options = (filtered_df['Start Time'].astype(str) + ' - ' + filtered_df['Phone Number'].astype(str)).tolist()
     selected_index = st.selectbox("Select a log to view details", options=range(len(filtered_df)), format_func=lambda i: options[i])
     
     if selected_index is not None:
-        selected_log = filtered_df.iloc[selected_index]
+        selected_log = st.session_state.logs[filtered_df['log_id'].iloc[selected_index]]
         col1, col2 = st.columns(2)
         with col1:
             with st.expander("System Prompt"):
-                st.markdown(f"```\n{selected_log['System Prompt']}\n```")
+                st.markdown(f"```\n{selected_log['metadata']['LLM_system_prompt']}\n```")
             with st.expander("First Message"):
-                st.markdown(f"```\n{selected_log['First Message']}\n```")
+                st.markdown(f"```\n{selected_log['metadata']['first_message']}\n```")
         with col2:
             with st.expander("Conversation Transcript"):
-                # Create a container for the transcript
-                transcript_container = st.container()
-                
-                # Display each message with proper formatting
-                for msg in selected_log['Conversation']:
-                    role = msg['role'].capitalize()
-                    content = msg['content']
-                    
-                    # Create two columns for role and content
-                    role_col, content_col = transcript_container.columns([1, 4])
-                    
-                    # Display role in bold
-                    with role_col:
-                        st.markdown(f"**{role}:**", unsafe_allow_html=True)
-                    
-                    # Display content
-                    with content_col:
-                        st.text(content)
-                    
+                # Render the whole transcript as a single element
+                transcript_html = "<br><br>".join(
+                    "<strong>{}:</strong> {}".format(
+                        html.escape(str(msg.get('role') or '').capitalize()),
+                        html.escape(str(msg.get('content') or '')).replace('\n', '<br>')
+                    )
+                    for msg in selected_log['conversation_transcript']
+                )
+                st.markdown(f'<div class="conversation-text">{transcript_html}</div>', unsafe_allow_html=True)
+
             with st.expander("Audio Recording"):
-                st.audio(selected_log['Audio URL'])
+                st.audio(selected_log['audio_file']['sas_url'])
+
+# Title and current time
+st.title("📊 Call Analytics Dashboard")
+current_time = datetime.now(IST_TIMEZONE).strftime("%A, %B %d, %Y %I:%M %p")
+st.write(f"Current date and time: {current_time} IST")
+
+# Initialize session state variables
+if 'logs' not in st.session_state:
+    st.session_state.logs = []
+if 'prev_start_date' not in st.session_state:
+    st.session_state.prev_start_date = None
+if 'prev_end_date' not in st.session_state:
+    st.session_state.prev_end_date = None
+if 'fetched' not in st.session_state:
+    st.session_state.fetched = False
+if 'df' not in st.session_state:
+    st.session_state.df = None
+if 'aggregates' not in st.session_state:
+    st.session_state.aggregates = None
+if 'figures' not in st.session_state:
+    st.session_state.figures = None
+if 'filter_options' not in st.session_state:
+    st.session_state.filter_options = None
+
+# Date range selector in sidebar
+with st.sidebar:
+    st.header("📅 Date Range")
+    start_date = st.date_input("From Date", value=(datetime.now(IST_TIMEZONE) - timedelta(days=7)).date())
+    end_date = st.date_input("To Date", value=datetime.now(IST_TIMEZONE).date())
+    
+    if st.button("Fetch Logs", type="primary", use_container_width=True):
+        with st.spinner("Fetching logs..."):
+            try:
+                start_datetime = datetime.combine(start_date, time.min, tzinfo=IST_TIMEZONE)
+                end_datetime = datetime.combine(end_date, time.max, tzinfo=IST_TIMEZONE)
+                logs = cached_fetch_call_logs(start_datetime.isoformat(), end_datetime.isoformat())
+                if logs:
+                    df = build_dataframe(logs)
+                    aggregates = build_aggregates(df)
+                    figures = build_figures(aggregates)
+                    filter_options = build_filter_options(df)
+                else:
+                    df = aggregates = figures = filter_options = None
+                st.session_state.logs = logs
+                st.session_state.df = df
+                st.session_state.aggregates = aggregates
+                st.session_state.figures = figures
+                st.session_state.filter_options = filter_options
+                st.session_state.fetched = True
+                st.session_state.prev_start_date = start_date
+                st.session_state.prev_end_date = end_date
+            except Exception as e:
+                st.error(f"Error fetching logs: {e}")
+
+# Clear logs if date range changes
+if start_date != st.session_state.prev_start_date or end_date != st.session_state.prev_end_date:
+    st.session_state.logs = []
+    st.session_state.df = None
+    st.session_state.aggregates = None
+    st.session_state.figures = None
+    st.session_state.filter_options = None
+    st.session_state.fetched = False
+
+# Display content based on session state
+if st.session_state.logs:
+    df = st.session_state.df
+    figures = st.session_state.figures
+
+    # Call Statistics Section
+    st.header("📈 Call Statistics")
+    col1, col2, col3, col4 = st.columns(4)
+    
+    total_calls = len(df)
+    total_duration = df['Total Seconds'].sum() / 60
+    total_cost = df['Total Cost (USD)'].sum()
+    avg_duration = df['Total Seconds'].mean() / 60
+    
+    with col1:
+        st.metric("Total Calls", f"{total_calls:,}")
+    with col2:
+        st.metric("Total Duration", f"{total_duration:.1f} min")
+    with col3:
+        st.metric("Average Duration", f"{avg_duration:.1f} min")
+    with col4:
+        st.metric("Total Cost", f"${total_cost:.2f}")
+
+    # Call Analysis Section
+    st.header("📊 Call Analysis")
+    
+    # Create tabs for different analyses
+    tab1, tab2, tab3, tab4 = st.tabs(["Cost Analysis", "Language Distribution", "Time Analysis", "Model Usage"])
+    
+    with tab1:
+        col1, col2 = st.columns(2)
+        with col1:
+            # Cost breakdown pie chart
+            st.plotly_chart(figures['cost'], use_container_width=True, key='fig_cost')
+        
+        with col2:
+            # Cost per call over time
+            st.plotly_chart(figures['cost_time'], use_container_width=True, key='fig_cost_time')
+    
+    with tab2:
+        col1, col2 = st.columns(2)
+        with col1:
+            # STT Language distribution
+            st.plotly_chart(figures['stt'], use_container_width=True, key='fig_stt')
+        
+        with col2:
+            # TTS Voice distribution
+            st.plotly_chart(figures['tts'], use_container_width=True, key='fig_tts')
+    
+    with tab3:
+        col1, col2 = st.columns(2)
+        with col1:
+            # Call duration distribution
+            st.plotly_chart(figures['duration'], use_container_width=True, key='fig_duration')
+        
+        with col2:
+            # Calls over time
+            st.plotly_chart(figures['time'], use_container_width=True, key='fig_time')
+    
+    with tab4:
+        col1, col2 = st.columns(2)
+        with col1:
+            # LLM Model distribution
+            st.plotly_chart(figures['llm'], use_container_width=True, key='fig_llm')
+        
+        with col2:
+            # Provider distribution
+            st.plotly_chart(figures['provider'], use_container_width=True, key='fig_provider')
+
+    # Call Logs Section with Filters
+    render_logs_section(df, st.session_state.filter_options)
 
 elif st.session_state.fetched:
     st.info("No logs found in the selected date range.")
@@ -1,104 +1,411 @@
 import os
+import hashlib
+import tempfile
+import calendar
 import json
-from datetime import datetime
-from typing import List, Optional, Dict, Any
-from azure.storage.blob import BlobServiceClient
+import heapq
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+from typing import Iterator, List, Optional, Dict, Any, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from azure.core.exceptions import AzureError
+from azure.core.pipeline.transport import RequestsTransport
+from azure.storage.blob import BlobServiceClient, ContainerClient
 from dotenv import load_dotenv
-import pytz
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
 # Configure logging
 logger = logging.getLogger("teliphonic-rag-agent")
 
-# Azure credentials
-AZURE_STORAGE_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
+# Azure container holding the call logs; the connection string is read when
+# the client is first needed so that importing this module never requires it
 AZURE_LOGS_CONTAINER_NAME = os.getenv("AZURE_LOGS_CONTAINER_NAME", "call-logs")
 
+# Optional directory for local copies of downloaded blobs, keyed by blob name
+# and etag. The blobs hold phone numbers, transcripts and SAS URLs and entries
+# are never pruned, so the cache is off unless CALL_LOGS_CACHE_DIR is set
+CACHE_DIR = os.getenv("CALL_LOGS_CACHE_DIR") or None
+
 # Timezone for IST
-IST_TIMEZONE = pytz.timezone('Asia/Kolkata')
+IST_TIMEZONE = ZoneInfo('Asia/Kolkata')
 
-# Initialize Azure client
-logger.debug("Initializing Azure client...")
-blob_service_client = BlobServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
-container_client = blob_service_client.get_container_client(AZURE_LOGS_CONTAINER_NAME)
+# orjson parses the raw blob bytes directly and is several times faster than json
+_json_loads = orjson.loads if orjson else json.loads
 
-def fetch_call_logs(
+# IST is a fixed UTC+05:30 offset with no daylight saving
+IST_UTC_OFFSET_SECONDS = 5 * 3600 + 30 * 60
+
+# Blob names start with the call's IST start time in this format
+BLOB_KEY_FORMAT = "%Y-%m-%d/%H_%M_%S"
+BLOB_KEY_LENGTH = len("YYYY-MM-DD/HH_MM_SS")
+
+# Blob listing page size (the service maximum), to minimize list round trips
+LIST_RESULTS_PER_PAGE = 5000
+
+# Longest range listed one day prefix at a time; each day costs a sequential
+# list round trip, so longer ranges are listed in a single unprefixed pass
+MAX_PREFIX_LISTING_DAYS = 31
+
+# Maximum number of blobs downloaded concurrently
+MAX_DOWNLOAD_WORKERS = 32
+
+# Maximum number of downloads submitted but not yet consumed while streaming
+MAX_PENDING_DOWNLOADS = 2 * MAX_DOWNLOAD_WORKERS
+
+# Size of each ranged GET when a blob is larger than a single request
+MAX_CHUNK_GET_SIZE = 4 * 1024 * 1024
+
+# Socket read size, matching the adapter azure-core mounts on its own sessions
+SOCKET_READ_BLOCK_SIZE = 32 * 1024
+
+# Every call log carries this key; blobs without it are skipped before parsing
+CALL_TIMESTAMPS_MARKER = b'"call_timestamps"'
+
+class _BlobHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that reads from the socket in SOCKET_READ_BLOCK_SIZE blocks."""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['blocksize'] = SOCKET_READ_BLOCK_SIZE
+        super().init_poolmanager(*args, **kwargs)
+
+@lru_cache(maxsize=1)
+def _get_container_client() -> ContainerClient:
+    """
+    Create the Azure container client on first use and reuse it afterwards.
+    
+    The HTTP connection pool is sized to the download thread pool, plus one for
+    the listing on the calling thread, so that concurrent requests keep their
+    connections alive instead of reopening them. Passing our own session skips
+    azure-core's session setup, so the adapter repeats its settings: a larger
+    socket read size and no urllib3 retries (the SDK retry policy handles them).
+    
+    Raises:
+        RuntimeError: If AZURE_STORAGE_CONNECTION_STRING is not set
+    """
+    connection_string = os.environ.get("AZURE_STORAGE_CONNECTION_STRING")
+    if not connection_string:
+        raise RuntimeError("AZURE_STORAGE_CONNECTION_STRING environment variable is not set")
+    
+    logger.debug("Initializing Azure client...")
+    session = requests.Session()
+    adapter = _BlobHTTPAdapter(
+        pool_maxsize=MAX_DOWNLOAD_WORKERS + 1,
+        max_retries=Retry(total=False, redirect=False, raise_on_status=False)
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    blob_service_client = BlobServiceClient.from_connection_string(
+        connection_string,
+        max_chunk_get_size=MAX_CHUNK_GET_SIZE,
+        transport=RequestsTransport(session=session)
+    )
+    return blob_service_client.get_container_client(AZURE_LOGS_CONTAINER_NAME)
+
+@lru_cache(maxsize=1024)
+def _day_start_timestamp(date_str: str) -> int:
+    """
+    Convert the YYYY-MM-DD day prefix of a blob name to the Unix time of its IST midnight.
+    
+    Cached because every blob of the same day shares this prefix.
+    """
+    return calendar.timegm(date.fromisoformat(date_str).timetuple()) - IST_UTC_OFFSET_SECONDS
+
+def _parse_blob_timestamp(blob_name: str) -> Optional[int]:
+    """
+    Parse the call start time from a blob name.
+    
+    Args:
+        blob_name (str): Blob name (format: YYYY-MM-DD/HH_MM_SS_phone.json)
+        
+    Returns:
+        Optional[int]: Start time as Unix seconds, or None if the name does not match the format
+    """
+    path_parts = blob_name.split('/')
+    if len(path_parts) != 2:
+        return None
+    
+    time_parts = path_parts[1].split('_')[0:3]  # Get HH_MM_SS part
+    if len(time_parts) != 3 or not all(part.isascii() and part.isdecimal() for part in time_parts):
+        return None
+    hour, minute, second = map(int, time_parts)
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    
+    try:
+        day_start = _day_start_timestamp(path_parts[0])
+    except ValueError:
+        return None
+    return day_start + hour * 3600 + minute * 60 + second
+
+def _prepare_cache_dir() -> Optional[str]:
+    """
+    Create the cache directory if needed.
+    
+    Returns:
+        Optional[str]: The cache directory, or None if caching is disabled or
+            the directory cannot be created
+    """
+    if not CACHE_DIR:
+        return None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Cache directory {CACHE_DIR} is unusable, fetching without cache: {e}")
+        return None
+    return CACHE_DIR
+
+def _cache_path(cache_dir: str, blob_name: str, etag: str) -> str:
+    """Return the cache file for a blob version; a changed blob gets a new etag and so a new file."""
+    key = hashlib.blake2b(f"{blob_name}:{etag}".encode(), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, key)
+
+def _read_cache(cache_path: str) -> Optional[bytes]:
+    """Return cached blob bytes, or None on a miss or an unreadable entry so the blob is downloaded."""
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            return cache_file.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Could not read cached blob at {cache_path}: {e}")
+        return None
+
+def _write_cache(cache_path: str, data: bytes) -> None:
+    """
+    Atomically write blob bytes to the cache.
+    
+    The bytes go to a temporary file that is then renamed into place, so a
+    concurrent reader never sees a partial file. Failures only cost the cache
+    entry, so they are logged instead of raised.
+    """
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path))
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logger.warning(f"Could not cache blob at {cache_path}: {e}")
+
+def _download_call_log(
+    blob_name: str,
+    etag: str,
+    cache_dir: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    """
+    Download and parse a single call log blob, reading it from the local cache when possible.
+    
+    Args:
+        blob_name (str): Name of the blob to download
+        etag (str): ETag of the blob as listed, identifying this version of it
+        cache_dir (Optional[str]): Cache directory, or None to always download
+        
+    Returns:
+        Optional[Dict[str, Any]]: Call log data, or None if the blob is not a call log
+    """
+    cache_path = _cache_path(cache_dir, blob_name, etag) if cache_dir else None
+    raw = _read_cache(cache_path) if cache_path else None
+    if raw is None:
+        blob_client = _get_container_client().get_blob_client(blob_name)
+        raw = blob_client.download_blob().readall()
+        # Raw bytes are cached so non-call-log blobs are skipped offline too
+        if cache_path:
+            _write_cache(cache_path, raw)
+    
+    # A byte search is far cheaper than parsing a blob we would discard
+    if CALL_TIMESTAMPS_MARKER not in raw:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Skipping blob without call timestamps: %s", blob_name)
+        return None
+    log_data = _json_loads(raw)
+    
+    # Parse call timestamps once so consumers get datetime objects
+    call_timestamps = log_data['call_timestamps']
+    call_timestamps['start'] = datetime.fromisoformat(call_timestamps['start'])
+    call_timestamps['end'] = datetime.fromisoformat(call_timestamps['end'])
+    
+    # Add blob name to the log data
+    log_data['blob_name'] = blob_name
+    return log_data
+
+def _load_call_log(
+    blob_name: str,
+    etag: str,
+    cache_dir: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    """
+    Download a call log blob, logging and skipping it on failure.
+    
+    Args:
+        blob_name (str): Name of the blob to download
+        etag (str): ETag of the blob as listed
+        cache_dir (Optional[str]): Cache directory, or None to always download
+        
+    Returns:
+        Optional[Dict[str, Any]]: Call log data, or None if the blob could not be loaded
+    """
+    try:
+        log_data = _download_call_log(blob_name, etag, cache_dir)
+    except (AzureError, ValueError, KeyError, TypeError) as e:
+        logger.error(f"Error processing blob {blob_name}: {e}")
+        return None
+    if log_data is not None and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Successfully loaded call log: %s", blob_name)
+    return log_data
+
+def _start_timestamp(log_data: Dict[str, Any]) -> float:
+    """Sort key: a call log's start time as epoch seconds."""
+    return log_data['call_timestamps']['start'].timestamp()
+
+def _iter_blob_names(
+    start_date: Optional[datetime],
+    end_date: Optional[datetime]
+) -> Iterator[Tuple[str, str]]:
+    """
+    Yield the call log blobs whose start time falls in the date range.
+    
+    Args:
+        start_date (Optional[datetime]): Timezone-aware start of the range (inclusive)
+        end_date (Optional[datetime]): Timezone-aware end of the range (inclusive)
+        
+    Yields:
+        Tuple[str, str]: Name and etag of each matching blob, in listing order
+    """
+    # Blob names start with their IST day (YYYY-MM-DD/), so a short bounded
+    # range is listed one day prefix at a time instead of scanning the container
+    prefixes = [None]
+    if start_date and end_date:
+        first_day = start_date.astimezone(IST_TIMEZONE).date()
+        last_day = end_date.astimezone(IST_TIMEZONE).date()
+        day_count = (last_day - first_day).days + 1
+        if day_count <= MAX_PREFIX_LISTING_DAYS:
+            prefixes = [
+                f"{(first_day + timedelta(days=offset)).isoformat()}/"
+                for offset in range(day_count)
+            ]
+    
+    # Blob names begin with their zero-padded IST start time, so comparing
+    # that prefix as a string rejects out-of-range blobs without parsing them
+    lo_key = start_date.astimezone(IST_TIMEZONE).strftime(BLOB_KEY_FORMAT) if start_date else None
+    hi_key = end_date.astimezone(IST_TIMEZONE).strftime(BLOB_KEY_FORMAT) if end_date else None
+    lo_timestamp = start_date.timestamp() if start_date else None
+    hi_timestamp = end_date.timestamp() if end_date else None
+    
+    container_client = _get_container_client()
+    for prefix in prefixes:
+        blob_list = container_client.list_blobs(
+            name_starts_with=prefix,
+            results_per_page=LIST_RESULTS_PER_PAGE
+        )
+        for blob in blob_list:
+            blob_key = blob.name[:BLOB_KEY_LENGTH]
+            if (lo_key and blob_key < lo_key) or (hi_key and blob_key > hi_key):
+                continue
+            
+            blob_timestamp = _parse_blob_timestamp(blob.name)
+            if blob_timestamp is None:
+                logger.warning(f"Skipping blob with unexpected name: {blob.name}")
+                continue
+            
+            # Filter by exact date range (sub-second bounds)
+            if lo_timestamp is not None and blob_timestamp < lo_timestamp:
+                continue
+            if hi_timestamp is not None and blob_timestamp > hi_timestamp:
+                continue
+            
+            yield blob.name, blob.etag
+
+def iter_call_logs(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream call logs from Azure Blob Storage as they are downloaded.
+    
+    Logs are yielded in listing order, not sorted by start time. At most
+    MAX_PENDING_DOWNLOADS blobs are in flight at once, so memory stays bounded
+    however many logs the range holds.
+    
+    Args:
+        start_date (Optional[datetime]): Start date for filtering logs (inclusive)
+        end_date (Optional[datetime]): End date for filtering logs (inclusive)
+        
+    Yields:
+        Dict[str, Any]: Call log data, with call_timestamps start/end parsed
+            into datetime objects
+    """
+    # Ensure dates are timezone-aware
+    if start_date and not start_date.tzinfo:
+        start_date = start_date.replace(tzinfo=IST_TIMEZONE)
+    if end_date and not end_date.tzinfo:
+        end_date = end_date.replace(tzinfo=IST_TIMEZONE)
+        
+    # If end_date is provided, set it to end of day
+    if end_date:
+        end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
+        
+    logger.debug(f"Fetching call logs from {start_date} to {end_date}")
+    
+    # Download and parse the matching blobs concurrently while listing continues,
+    # yielding each result in submission order once the window is full
+    cache_dir = _prepare_cache_dir()
+    with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+        pending = deque()
+        for blob_name, etag in _iter_blob_names(start_date, end_date):
+            pending.append(executor.submit(_load_call_log, blob_name, etag, cache_dir))
+            if len(pending) >= MAX_PENDING_DOWNLOADS:
+                log_data = pending.popleft().result()
+                if log_data is not None:
+                    yield log_data
+        
+        while pending:
+            log_data = pending.popleft().result()
+            if log_data is not None:
+                yield log_data
+
+def fetch_call_logs(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    limit: Optional[int] = None
 ) -> List[Dict[str, Any]]:
     """
-    Fetch call logs from Azure Blob Storage.
+    Fetch call logs from Azure Blob Storage, most recent first.
     
     Args:
         start_date (Optional[datetime]): Start date for filtering logs (inclusive)
         end_date (Optional[datetime]): End date for filtering logs (inclusive)
+        limit (Optional[int]): Maximum number of logs to return; only the most
+            recent logs are kept while streaming
         
     Returns:
-        List[Dict[str, Any]]: List of call log data
+        List[Dict[str, Any]]: List of call log data, with call_timestamps
+            start/end parsed into datetime objects
     """
     try:
-        # Ensure dates are timezone-aware
-        if start_date and not start_date.tzinfo:
-            start_date = start_date.replace(tzinfo=IST_TIMEZONE)
-        if end_date and not end_date.tzinfo:
-            end_date = end_date.replace(tzinfo=IST_TIMEZONE)
-            
-        # If end_date is provided, set it to end of day
-        if end_date:
-            end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-            
-        logger.debug(f"Fetching call logs from {start_date} to {end_date}")
+        call_logs = iter_call_logs(start_date, end_date)
         
-        # List all blobs in the container
-        call_logs = []
-        blob_list = container_client.list_blobs()
-        
-        for blob in blob_list:
-            try:
-                # Parse date from blob name (format: YYYY-MM-DD/HH_MM_SS_phone.json)
-                path_parts = blob.name.split('/')
-                if len(path_parts) != 2:
-                    continue
-                    
-                date_str = path_parts[0]
-                time_str = path_parts[1].split('_')[0:3]  # Get HH_MM_SS part
-                time_str = '_'.join(time_str)
-                
-                # Create datetime object from blob name
-                blob_datetime = datetime.strptime(
-                    f"{date_str} {time_str}",
-                    "%Y-%m-%d %H_%M_%S"
-                ).replace(tzinfo=IST_TIMEZONE)
-                
-                # Filter by date range if specified
-                if start_date and blob_datetime < start_date:
-                    continue
-                if end_date and blob_datetime > end_date:
-                    continue
-                
-                # Download and parse the blob content
-                blob_client = container_client.get_blob_client(blob.name)
-                blob_data = blob_client.download_blob()
-                log_data = json.loads(blob_data.readall())
-                
-                # Add blob name to the log data
-                log_data['blob_name'] = blob.name
-                
-                call_logs.append(log_data)
-                logger.debug(f"Successfully loaded call log: {blob.name}")
-                
-            except Exception as e:
-                logger.error(f"Error processing blob {blob.name}: {e}")
-                continue
-        
-        # Sort logs by timestamp
-        call_logs.sort(
-            key=lambda x: datetime.fromisoformat(x['call_timestamps']['start']),
-            reverse=True  # Most recent first
-        )
+        # Sort logs by timestamp, comparing epoch seconds rather than
+        # timezone-aware datetimes; with a limit only the newest are held
+        if limit is None:
+            call_logs = sorted(call_logs, key=_start_timestamp, reverse=True)
+        else:
+            call_logs = heapq.nlargest(limit, call_logs, key=_start_timestamp)
         
         logger.info(f"Successfully fetched {len(call_logs)} call logs")
         return call_logs
@@ -111,8 +418,6 @@ def fetch_call_logs(
 if __name__ == "__main__":
     try:
         # Example: Fetch logs for the last 7 days
-        from datetime import timedelta
-        
         end_date = datetime.now(IST_TIMEZONE)
         start_date = end_date - timedelta(days=7)
         
@@ -122,7 +427,10 @@ if __name__ == "__main__":
         # Print first log as example
         if logs:
             print("\nExample log:")
-            print(json.dumps(logs, indent=2))
+            if orjson:
+                print(orjson.dumps(logs, option=orjson.OPT_INDENT_2).decode())
+            else:
+                print(json.dumps(logs, indent=2, default=str))
             
     except Exception as e:
         print(f"Error: {e}") 
\ No newline at end of file